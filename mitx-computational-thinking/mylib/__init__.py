@@ -1,19 +1,43 @@
-from .items import Item, build_items, build_many_items
-from .utils import get_binary_rep
-from .knapsack import gen_powerset, choose_best, test_best
+from .items import Item, build_items, build_many_items, ItemSet
+from .utils import get_binary_rep, get_binary_bits, gray_code_flips
+from .knapsack import (
+    gen_powerset, choose_best, test_best, dp_knapsack, bb_knapsack,
+    mitm_knapsack, Capacity_Curve, solve_all_capacities,
+    parallel_choose_best, gray_choose_best,
+)
 from .graphs import (
-    Node, Edge, Weighted_Edge, Digraph, Graph, DFS,
-    shortest_path, print_path, test_SP,
+    Node, Edge, Weighted_Edge, Digraph, Graph, Frozen_Digraph,
+    DFS, iter_simple_paths, bfs_shortest_path, dijkstra_distances,
+    dijkstra, astar, bidirectional_bfs, bidirectional_dijkstra,
+    k_shortest_paths, shortest_path, strongly_connected_components,
+    Condensation, Reachability_Index, Dynamic_SSSP, Path_Cache, write_edges,
+    print_path, test_SP,
 )
+from .graph_io import load_edge_list, save_snapshot, open_snapshot
+from .landmarks import Landmarks
+from .graph_batch import floyd_warshall, iter_distance_rows
 
 __all__ = [
     # items.py
-    "Item", "build_items", "build_many_items",
+    "Item", "build_items", "build_many_items", "ItemSet",
     # utils.py
-    "get_binary_rep",
+    "get_binary_rep", "get_binary_bits", "gray_code_flips",
     # knapsack.py
-    "gen_powerset", "choose_best", "test_best",
+    "gen_powerset", "choose_best", "test_best", "dp_knapsack", "bb_knapsack",
+    "mitm_knapsack", "Capacity_Curve", "solve_all_capacities",
+    "parallel_choose_best", "gray_choose_best",
     # graphs.py
-    "Node", "Edge", "Weighted_Edge", "Digraph", "Graph",
-    "DFS", "shortest_path", "print_path", "test_SP",
+    "Node", "Edge", "Weighted_Edge", "Digraph", "Graph", "Frozen_Digraph",
+    "DFS", "iter_simple_paths", "bfs_shortest_path", "dijkstra_distances",
+    "dijkstra", "astar",
+    "bidirectional_bfs", "bidirectional_dijkstra", "k_shortest_paths",
+    "shortest_path",
+    "strongly_connected_components", "Condensation", "Reachability_Index",
+    "Dynamic_SSSP", "Path_Cache", "write_edges", "print_path", "test_SP",
+    # graph_io.py
+    "load_edge_list", "save_snapshot", "open_snapshot",
+    # landmarks.py
+    "Landmarks",
+    # graph_batch.py
+    "floyd_warshall", "iter_distance_rows",
 ]
@@ -0,0 +1,109 @@
+# mylib/graph_batch.py
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .graphs import Frozen_Digraph
+from .graph_io import save_snapshot, open_snapshot
+
+# Floyd-Warshall does n vectorised O(n^2) passes; above this many nodes
+# one search per source is cheaper
+FLOYD_WARSHALL_MAX_NODES = 400
+
+# per-process state, set once by _init_worker
+_worker_graph = None
+_worker_targets = None
+
+
+def _init_worker(snapshot_path, target_names):
+    global _worker_graph, _worker_targets
+    _worker_graph = open_snapshot(snapshot_path)
+    _worker_targets = [_worker_graph.id_of(name) for name in target_names]
+
+
+def _worker_row(source_name, weighted):
+    dist = _worker_graph.distances_from(source_name, weighted)
+    return [dist[t] for t in _worker_targets]
+
+
+def floyd_warshall(graph, weighted=True):
+    """
+    All-pairs distances, relaxing through one pivot node per pass with
+    a whole-matrix NumPy minimum.
+    :param graph: Digraph or Frozen_Digraph
+    :param weighted: bool, sum weights or count hops
+    :return: (nodes, matrix) with matrix[i, j] the distance from
+        nodes[i] to nodes[j], inf if unreachable
+    """
+    nodes = graph.get_nodes()
+    ids = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    dist = np.full((n, n), np.inf)
+    for i, node in enumerate(nodes):
+        for child, weight in graph.weighted_children_of(node):
+            j = ids[child]
+            dist[i, j] = min(dist[i, j], weight if weighted else 1.0)
+    np.fill_diagonal(dist, 0.0)
+    for k in range(n):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+    return nodes, dist
+
+
+def iter_distance_rows(graph, sources=None, targets=None, weighted=True,
+                       method='auto', workers=None):
+    """
+    Stream one row of distances per source, running a single search per
+    source instead of one shortest_path call per pair.
+    With workers > 1 the graph is written once to a read-only snapshot
+    that every worker maps, so nothing is pickled per task; rows then
+    arrive in completion order.
+    :param graph: Digraph or Frozen_Digraph with uniquely named nodes
+    :param sources: list of Nodes, or None for every node
+    :param targets: list of Nodes for the row columns, or None for all
+    :param weighted: bool, sum weights (Dijkstra) or count hops (BFS)
+    :param method: 'search', 'floyd_warshall' or 'auto'
+    :param workers: number of worker processes, or None to run inline
+    :return: generator of (source, list of distances) pairs
+    """
+    frozen = graph if isinstance(graph, Frozen_Digraph) else graph.freeze()
+    nodes = frozen.get_nodes()
+    sources = nodes if sources is None else sources
+    targets = nodes if targets is None else targets
+    if method == 'auto':
+        small = len(nodes) <= FLOYD_WARSHALL_MAX_NODES
+        method = 'floyd_warshall' if small else 'search'
+    if method == 'floyd_warshall':
+        _, dist = floyd_warshall(frozen, weighted)
+        columns = [frozen.id_of(target) for target in targets]
+        for source in sources:
+            yield source, dist[frozen.id_of(source), columns].tolist()
+        return
+    if method != 'search':
+        raise ValueError("Unknown method: " + str(method))
+
+    if not workers or workers < 2:
+        columns = [frozen.id_of(target) for target in targets]
+        for source in sources:
+            dist = frozen.distances_from(source, weighted)
+            yield source, [dist[t] for t in columns]
+        return
+
+    fd, path = tempfile.mkstemp(suffix='.graph')
+    os.close(fd)
+    try:
+        save_snapshot(frozen, path)
+        target_names = [target.get_name() for target in targets]
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(path, target_names)) as pool:
+            # one task per entry, so repeated sources give repeated rows
+            # just as they do inline
+            futures = {pool.submit(_worker_row, source.get_name(),
+                                   weighted): i
+                       for i, source in enumerate(sources)}
+            for future in as_completed(futures):
+                yield sources[futures[future]], future.result()
+    finally:
+        os.remove(path)
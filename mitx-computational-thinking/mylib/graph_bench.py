@@ -0,0 +1,211 @@
+# mylib/graph_bench.py
+"""
+Seeded synthetic graphs and a JSON benchmark report for mylib.graphs.
+
+    python -m mylib.graph_bench --nodes 10000 --seed 0 > run.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from .graphs import Node, Digraph, Graph, shortest_path
+
+# 'dfs' enumerates paths exponentially, so it only runs when asked for
+DEFAULT_ALGORITHMS = ('bfs', 'dijkstra', 'bidirectional_bfs',
+                      'bidirectional_dijkstra')
+
+
+def _empty(graph_type, n):
+    graph = graph_type()
+    nodes = [Node(str(i)) for i in range(n)]
+    for node in nodes:
+        graph.add_node(node)
+    return graph, nodes
+
+
+def grid_graph(rows, cols, seed=None, graph_type=Graph, max_weight=10):
+    """
+    :return: rows x cols lattice with random integer weights
+    """
+    rng = random.Random(seed)
+    graph, nodes = _empty(graph_type, rows * cols)
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            if c + 1 < cols:
+                graph.connect(nodes[i], nodes[i + 1],
+                              rng.randint(1, max_weight))
+            if r + 1 < rows:
+                graph.connect(nodes[i], nodes[i + cols],
+                              rng.randint(1, max_weight))
+    return graph
+
+
+def erdos_renyi(n, avg_degree=4, seed=None, graph_type=Digraph,
+                max_weight=10):
+    """
+    :return: G(n, m) random graph with m = n * avg_degree edges
+    """
+    rng = random.Random(seed)
+    graph, nodes = _empty(graph_type, n)
+    for _ in range(n * avg_degree):
+        graph.connect(nodes[rng.randrange(n)], nodes[rng.randrange(n)],
+                      rng.randint(1, max_weight))
+    return graph
+
+
+def preferential_attachment(n, m=2, seed=None, graph_type=Graph,
+                            max_weight=10):
+    """
+    :return: Barabasi-Albert graph; each new node links to m existing
+        nodes chosen with probability proportional to their degree
+    """
+    rng = random.Random(seed)
+    graph, nodes = _empty(graph_type, n)
+    ends = []  # one entry per edge endpoint, so sampling follows degree
+    for i in range(1, n):
+        targets = set()
+        while len(targets) < min(m, i):
+            targets.add(rng.choice(ends) if ends else rng.randrange(i))
+        for j in targets:
+            graph.connect(nodes[i], nodes[j], rng.randint(1, max_weight))
+            ends += (i, j)
+    return graph
+
+
+def road_like(n, k=3, seed=None, graph_type=Graph):
+    """
+    :return: random points in the unit square, each joined to its k
+        nearest neighbours with Euclidean weights (sparse, planar-ish)
+    """
+    rng = random.Random(seed)
+    graph, nodes = _empty(graph_type, n)
+    points = [(rng.random(), rng.random()) for _ in range(n)]
+    # bucket points into cells holding about k points each
+    side = max(1, int(math.sqrt(n / max(k, 1))))
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        key = (min(int(x * side), side - 1), min(int(y * side), side - 1))
+        cells.setdefault(key, []).append(i)
+    added = set()
+    for i, (x, y) in enumerate(points):
+        cx, cy = min(int(x * side), side - 1), min(int(y * side), side - 1)
+        near = []
+        radius = 1
+        while len(near) <= k and radius <= side:
+            near = [j for dx in range(-radius, radius + 1)
+                    for dy in range(-radius, radius + 1)
+                    for j in cells.get((cx + dx, cy + dy), ())]
+            radius += 1
+        near.sort(key=lambda j: (points[j][0] - x) ** 2
+                  + (points[j][1] - y) ** 2)
+        for j in near[1:k + 1]:
+            pair = (min(i, j), max(i, j))
+            if pair not in added:
+                added.add(pair)
+                graph.connect(nodes[i], nodes[j],
+                              math.dist(points[i], points[j]))
+    return graph
+
+
+GENERATORS = {
+    'grid': lambda n, seed: grid_graph(max(1, int(math.sqrt(n))),
+                                       max(1, int(math.sqrt(n))), seed),
+    'erdos_renyi': lambda n, seed: erdos_renyi(n, seed=seed),
+    'preferential_attachment':
+        lambda n, seed: preferential_attachment(n, seed=seed),
+    'road_like': lambda n, seed: road_like(n, seed=seed),
+}
+
+
+def benchmark_graph(build, queries=20, seed=None,
+                    algorithms=DEFAULT_ALGORITHMS):
+    """
+    :param build: function () -> graph
+    :param queries: random (start, end) pairs timed per algorithm
+    :param seed: seed for choosing query pairs
+    :param algorithms: names accepted by shortest_path
+    :return: dict of timings (seconds) and peak memory (bytes)
+    """
+    start = time.perf_counter()
+    graph = build()
+    result = {'construction_s': time.perf_counter() - start}
+
+    # tracemalloc slows allocation down, so memory gets its own build
+    tracemalloc.start()
+    build()
+    result['construction_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    nodes = graph.get_nodes()
+    result['nodes'] = len(nodes)
+    start = time.perf_counter()
+    edges = 0
+    for node in nodes:
+        for _ in graph.children_of(node):
+            edges += 1
+    result['edges'] = edges
+    result['children_of_s'] = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+    result['shortest_path'] = {}
+    for algorithm in algorithms:
+        tracemalloc.start()
+        start = time.perf_counter()
+        for a, b in pairs:
+            shortest_path(graph, a, b, algorithm=algorithm)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result['shortest_path'][algorithm] = {
+            'total_s': elapsed,
+            'per_query_s': elapsed / max(queries, 1),
+            'peak_bytes': peak,
+        }
+    return result
+
+
+def run_benchmarks(nodes=1000, seed=0, queries=20,
+                   generators=tuple(GENERATORS),
+                   algorithms=DEFAULT_ALGORITHMS):
+    """
+    :return: JSON-ready dict with one entry per generator
+    """
+    report = {
+        'python': platform.python_version(),
+        'nodes': nodes,
+        'seed': seed,
+        'queries': queries,
+        'graphs': {},
+    }
+    for name in generators:
+        build = GENERATORS[name]
+        report['graphs'][name] = benchmark_graph(
+            lambda: build(nodes, seed), queries, seed, algorithms)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--generators', nargs='+', default=list(GENERATORS),
+                        choices=list(GENERATORS))
+    parser.add_argument('--algorithms', nargs='+',
+                        default=list(DEFAULT_ALGORITHMS))
+    args = parser.parse_args(argv)
+    report = run_benchmarks(args.nodes, args.seed, args.queries,
+                            args.generators, args.algorithms)
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
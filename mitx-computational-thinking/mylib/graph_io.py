@@ -0,0 +1,140 @@
+# mylib/graph_io.py
+import csv
+import mmap
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from .graphs import Node, Digraph, Frozen_Digraph
+
+# snapshot layout, all little-endian:
+#   header: magic, format version, target item size, node count, edge count
+#   offsets   int64[n + 1]
+#   targets   int32[m] or int64[m], padded to 8 bytes
+#   weights   float64[m]
+#   name_offsets int64[n + 1]
+#   names     utf-8 bytes
+_MAGIC = b'MTCGRAPH'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIIqq')
+
+
+def _iter_rows(reader, header):
+    """Skip the header row, blank lines and '#' comments."""
+    if header:
+        next(reader, None)
+    for row in reader:
+        if row and not row[0].startswith('#'):
+            yield row
+
+
+def load_edge_list(source, graph=None, delimiter=None, header=False,
+                   chunk_size=65536):
+    """
+    Stream a src, dst[, weight] edge list into a graph, chunk_size rows
+    at a time, so only one chunk of rows is held in memory. Nodes are
+    interned by name and no Edge objects are created.
+    :param source: path or open text file
+    :param graph: Digraph (or Graph) to add to; a new Digraph if None
+    :param delimiter: field separator; tab for *.tsv paths, else comma
+    :param header: bool, skip the first row
+    :param chunk_size: rows parsed per batch
+    :return: the graph
+    """
+    if graph is None:
+        graph = Digraph()
+    if delimiter is None:
+        is_tsv = isinstance(source, str) and source.endswith('.tsv')
+        delimiter = '\t' if is_tsv else ','
+    fileobj = open(source, newline='') if isinstance(source, str) else source
+    try:
+        rows = _iter_rows(csv.reader(fileobj, delimiter=delimiter), header)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            for row in chunk:
+                weight = float(row[2]) if len(row) > 2 and row[2] else 1.0
+                graph.add_edge(row[0].strip(), row[1].strip(), weight)
+    finally:
+        if fileobj is not source:
+            fileobj.close()
+    return graph
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def save_snapshot(graph, path):
+    """
+    Write graph in the binary snapshot format read by open_snapshot.
+    :param graph: Digraph or Frozen_Digraph
+    :param path: file path
+    """
+    if not isinstance(graph, Frozen_Digraph):
+        graph = graph.freeze()
+    n, m = len(graph), graph.num_edges()
+    offsets, targets, weights = graph.csr_arrays()
+    offsets = array('q', offsets)
+    targets = array('i' if n < 2 ** 31 else 'q', targets)
+    weights = array('d', weights)
+    names = [graph.node_at(i).get_name().encode('utf-8') for i in range(n)]
+    name_offsets = array('q', [0])
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, targets.itemsize,
+                             n, m))
+        _little_endian(offsets).tofile(f)
+        _little_endian(targets).tofile(f)
+        f.write(b'\0' * (-f.tell() % 8))
+        _little_endian(weights).tofile(f)
+        _little_endian(name_offsets).tofile(f)
+        f.write(b''.join(names))
+
+
+def open_snapshot(path, use_mmap=True):
+    """
+    Open a snapshot written by save_snapshot. With use_mmap the edge
+    arrays are zero-copy views of the mapped file, so start-up costs only
+    the node table; pages are read in as queries touch them.
+    :param path: file path
+    :param use_mmap: bool, map the file instead of reading it
+    :return: Frozen_Digraph
+    """
+    with open(path, 'rb') as f:
+        if use_mmap and sys.byteorder == 'little':
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = memoryview(mapped)
+        else:
+            buf = memoryview(f.read())
+    magic, version, target_size, n, m = _HEADER.unpack_from(buf)
+    if magic != _MAGIC or version != _FORMAT_VERSION:
+        raise ValueError("Not a graph snapshot: " + str(path))
+
+    pos = _HEADER.size
+
+    def take(typecode, count, itemsize):
+        nonlocal pos
+        view = buf[pos:pos + count * itemsize]
+        pos += count * itemsize
+        if sys.byteorder == 'little':
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    offsets = take('q', n + 1, 8)
+    targets = take('i' if target_size == 4 else 'q', m, target_size)
+    pos += -pos % 8
+    weights = take('d', m, 8)
+    name_offsets = take('q', n + 1, 8)
+    blob = buf[pos:pos + name_offsets[n]].tobytes()
+    nodes = [Node(blob[name_offsets[i]:name_offsets[i + 1]].decode('utf-8'))
+             for i in range(n)]
+    return Frozen_Digraph(nodes, offsets, targets, weights)
@@ -0,0 +1,347 @@
+# mylib/graph_server.py
+"""
+Asyncio shortest-path service over a graph held in memory.
+
+    python -m mylib.graph_server graph.snapshot --port 8765
+
+Protocol: one JSON object per line in each direction.
+    {"id": 1, "source": "a", "target": "b"}
+        -> {"id": 1, "cost": 3.0, "path": ["a", "c", "b"]}
+    {"op": "stats"} -> counters and latency percentiles
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .graphs import Frozen_Digraph
+from .graph_io import load_edge_list, save_snapshot, open_snapshot
+
+# search trees each worker keeps for sources asked for again
+TREE_CACHE_SIZE = 4
+
+# per-process graph and tree cache, set once by _init_worker
+_worker_graph = None
+_worker_trees = None
+_worker_lock = None
+
+
+def _init_worker(snapshot_path):
+    global _worker_graph, _worker_trees, _worker_lock
+    _worker_graph = open_snapshot(snapshot_path)
+    _worker_trees = OrderedDict()
+    _worker_lock = threading.Lock()
+
+
+def _answer_targets(graph, trees, lock, source, targets, weighted):
+    """
+    Answer every target for one source from a single search tree, so
+    only the answers (not the n-sized tree arrays) leave the worker.
+    The last TREE_CACHE_SIZE trees stay in trees for later batches.
+    :return: (list of (cost, path names), both None if no path;
+        bool, whether the tree came from the cache)
+    """
+    with lock:
+        tree = trees.get(source)
+        if tree is not None:
+            trees.move_to_end(source)
+    cached = tree is not None
+    if not cached:
+        tree = graph.shortest_path_tree(source, weighted)
+        with lock:
+            trees[source] = tree
+            if len(trees) > TREE_CACHE_SIZE:
+                trees.popitem(last=False)
+    dist, parent = tree
+    answers = []
+    for target in targets:
+        path = graph.path_in_tree(parent, target)
+        if path is None:
+            answers.append((None, None))
+        else:
+            answers.append((dist[graph.id_of(target)],
+                            [node.get_name() for node in path]))
+    return answers, cached
+
+
+def _worker_answer(source, targets, weighted):
+    return _answer_targets(_worker_graph, _worker_trees, _worker_lock,
+                           source, targets, weighted)
+
+
+def _percentile(ordered, fraction):
+    # nearest-rank percentile of an already sorted list
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1,
+                      math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class Path_Server(object):
+    """
+    Serves shortest-path queries from a Frozen_Digraph.
+    Requests are batched per source: _batches holds the targets waiting
+    for a source, sent to a worker as one task that runs (or reuses) a
+    single search and returns just those answers. While a batch for a
+    source is running, new requests for it wait for the next batch.
+    Workers run in a pool so the event loop keeps accepting requests;
+    process workers map a snapshot of the graph instead of receiving it
+    pickled.
+    """
+    def __init__(self, graph, workers=None, weighted=True,
+                 use_processes=True, window=10000):
+        """
+        :param graph: Digraph or Frozen_Digraph with unique node names
+        :param workers: pool size, or None for the executor default
+        :param weighted: bool, Dijkstra costs or BFS hop counts
+        :param use_processes: bool, process pool rather than threads
+        :param window: number of recent latencies kept for percentiles
+        """
+        if not isinstance(graph, Frozen_Digraph):
+            graph = graph.freeze()
+        self._graph = graph
+        self._workers = workers
+        self._weighted = weighted
+        self._use_processes = use_processes
+        self._batches = {}
+        self._running = set()
+        self._tasks = set()
+        self._trees = OrderedDict()  # tree cache for thread workers
+        self._trees_lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._pool = None
+        self._snapshot = None
+        self._server = None
+        self.requests = 0
+        self.searches = 0
+        self.coalesced = 0
+        self.tree_cache_hits = 0
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """
+        :param host: interface for a TCP socket
+        :param port: TCP port, 0 to pick a free one
+        :param path: Unix socket path, used instead of host/port if given
+        :return: the bound socket address
+        """
+        if self._use_processes:
+            fd, self._snapshot = tempfile.mkstemp(suffix='.graph')
+            os.close(fd)
+            save_snapshot(self._graph, self._snapshot)
+            # spawned, not forked, so workers never inherit (and keep
+            # open) the sockets of connections accepted by this process
+            self._pool = ProcessPoolExecutor(
+                self._workers, multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(self._snapshot,))
+            # pay the worker start-up cost here, not on the first requests
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(self._pool, os.getpid)
+                for _ in range(self._workers or os.cpu_count() or 1)))
+        else:
+            self._pool = ThreadPoolExecutor(self._workers)
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle,
+                                                           path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle,
+                                                      host, port)
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self._snapshot is not None:
+            os.remove(self._snapshot)
+            self._snapshot = None
+
+    def _dispatch(self, source):
+        batch = self._batches.pop(source)
+        self._running.add(source)
+        task = asyncio.create_task(self._run_batch(source, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, source, batch):
+        loop = asyncio.get_running_loop()
+        targets = [target for target, _ in batch]
+        try:
+            if self._use_processes:
+                answers, cached = await loop.run_in_executor(
+                    self._pool, _worker_answer, source, targets,
+                    self._weighted)
+            else:
+                answers, cached = await loop.run_in_executor(
+                    self._pool, _answer_targets, self._graph, self._trees,
+                    self._trees_lock, source, targets, self._weighted)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            if cached:
+                self.tree_cache_hits += 1
+            else:
+                self.searches += 1
+            for (_, future), answer in zip(batch, answers):
+                if not future.done():
+                    future.set_result(answer)
+        finally:
+            self._running.discard(source)
+            if source in self._batches:
+                self._dispatch(source)
+
+    async def answer(self, source, target):
+        """
+        :param source: node name
+        :param target: node name
+        :return: dict with cost and path (names), both None if no path
+        """
+        self._graph.get_node(source)  # NameError for unknown names
+        self._graph.get_node(target)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._batches.get(source)
+        if batch is None:
+            batch = self._batches[source] = []
+            if source not in self._running:
+                # let requests already read this loop turn join the batch
+                loop.call_soon(self._dispatch, source)
+        else:
+            self.coalesced += 1
+        batch.append((target, future))
+        cost, path = await future
+        return {'cost': cost, 'path': path}
+
+    def latency_percentiles(self):
+        """
+        :return: dict of p50/p90/p99 request latency in milliseconds
+        """
+        ordered = sorted(self._latencies)
+        return {name: (None if value is None else value * 1000.0)
+                for name, value in (('p50', _percentile(ordered, 0.50)),
+                                    ('p90', _percentile(ordered, 0.90)),
+                                    ('p99', _percentile(ordered, 0.99)))}
+
+    def stats(self):
+        result = {
+            'requests': self.requests,
+            'searches': self.searches,
+            'coalesced': self.coalesced,
+            'tree_cache_hits': self.tree_cache_hits,
+        }
+        result.update(self.latency_percentiles())
+        return result
+
+    async def _respond(self, line, writer):
+        start = time.perf_counter()
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            if request.get('op') == 'stats':
+                reply = self.stats()
+            else:
+                self.requests += 1
+                reply = await self.answer(request['source'],
+                                          request['target'])
+        except Exception as e:  # report it; never leave a client waiting
+            request = request if isinstance(request, dict) else {}
+            reply = {'error': type(e).__name__ + ': ' + str(e)}
+        if 'id' in request:
+            reply['id'] = request['id']
+        writer.write((json.dumps(reply) + '\n').encode('utf-8'))
+        await writer.drain()
+        if 'error' not in reply and request.get('op') != 'stats':
+            self._latencies.append(time.perf_counter() - start)
+
+    async def _handle(self, reader, writer):
+        # each line is answered by its own task, so one client can
+        # pipeline requests and slow searches do not block fast ones
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+
+async def query(pairs, host='127.0.0.1', port=8765, path=None):
+    """
+    Minimal client: pipeline every (source, target) name pair over one
+    connection and wait for all answers.
+    :return: list of reply dicts in the order of pairs
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    for i, (source, target) in enumerate(pairs):
+        request = {'id': i, 'source': source, 'target': target}
+        writer.write((json.dumps(request) + '\n').encode('utf-8'))
+    await writer.drain()
+    replies = [None] * len(pairs)
+    for _ in pairs:
+        reply = json.loads(await reader.readline())
+        replies[reply.pop('id')] = reply
+    writer.close()
+    await writer.wait_closed()
+    return replies
+
+
+async def _serve(args):
+    if args.graph.endswith(('.csv', '.tsv')):
+        graph = load_edge_list(args.graph)
+    else:
+        graph = open_snapshot(args.graph)
+    server = Path_Server(graph, args.workers, not args.unweighted,
+                         not args.threads)
+    address = await server.start(args.host, args.port, args.unix)
+    print('Serving', len(graph), 'nodes on', address, flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('graph', help='snapshot file or .csv/.tsv edges')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='serve on this Unix socket path')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--threads', action='store_true',
+                        help='thread pool instead of processes')
+    parser.add_argument('--unweighted', action='store_true')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
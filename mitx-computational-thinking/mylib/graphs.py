@@ -1,6 +1,14 @@
 # mylib/graphs.py
+import heapq
+import json
+from array import array
+from collections import OrderedDict, deque
+from itertools import count, repeat
+
 
 class Node(object):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         """
         :param name: a string
@@ -17,6 +25,8 @@ class Node(object):
 
 
 class Edge(object):
+    __slots__ = ('_src', '_dest')
+
     def __init__(self, src, dest):
         """
         :param src: Node
@@ -31,11 +41,17 @@ class Edge(object):
     def get_destination(self):
         return self._dest
 
+    def get_weight(self):
+        # an unweighted edge counts as one hop
+        return 1.0
+
     def __str__(self):
         return self._src.get_name() + " -> " + self._dest.get_name()
 
 
 class Weighted_Edge(Edge):
+    __slots__ = ('_weight',)
+
     def __init__(self, src, dest, weight=1.0):
         """
         :param src: Node
@@ -57,55 +73,578 @@ class Weighted_Edge(Edge):
 
 class Digraph(object):
     """
-    nodes is a list of the nodes in the graph
-    edges is a dict mapping each node to a list of its children
+    edges is a dict mapping each node to a list of its children;
+    dict keys give hashed membership tests and keep insertion order,
+    so the dict doubles as the ordered node set
+    weights is a dict mapping each node to a list of edge weights,
+    parallel to its list of children
+    parents and parent_weights are the same two indexes for incoming
+    edges, so searches can also walk the graph backwards
+    version counts mutations, so caches can tell when they are stale
+    listeners are told about every mutation through node_added(node),
+    edge_added(src, dest, weight) and
+    edge_weight_changed(src, dest, old, new), so indexes can update
+    in place
+    by_name is a dict interning the first node added under each name
     """
+    # Graph stores every edge in both directions, so its parents are
+    # its children and the reverse index is skipped
+    _symmetric = False
+
     def __init__(self):
-        self._nodes = []
         self._edges = {}
+        self._weights = {}
+        self._parents = {}
+        self._parent_weights = {}
+        self._version = 0
+        self._listeners = []
+        self._by_name = {}
+
+    def get_version(self):
+        return self._version
+
+    def subscribe(self, listener):
+        """
+        :param listener: object with node_added, edge_added and
+            edge_weight_changed methods
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
 
     def add_node(self, node):
-        if node in self._nodes:
+        if node in self._edges:
             raise ValueError("Node already exists")
-        self._nodes.append(node)
+        self._version += 1
+        self._by_name.setdefault(node.get_name(), node)
         self._edges[node] = []
+        self._weights[node] = []
+        if not self._symmetric:
+            self._parents[node] = []
+            self._parent_weights[node] = []
+        for listener in self._listeners:
+            listener.node_added(node)
+
+    def get_node(self, name):
+        """
+        :param name: a string
+        :return: the node interned under name
+        """
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise NameError(name) from None
+
+    def intern(self, name):
+        """
+        :param name: a string
+        :return: the node named name, added to the graph if missing
+        """
+        node = self._by_name.get(name)
+        if node is None:
+            node = Node(name)
+            self.add_node(node)
+        return node
 
-    def add_edge(self, edge):
-        src = edge.get_source()
-        dest = edge.get_destination()
-        if src not in self._nodes or dest not in self._nodes:
+    def add_edge(self, edge, dest=None, weight=1.0):
+        """
+        Either add_edge(edge) with an Edge or Weighted_Edge, or the
+        lightweight add_edge(src_name, dest_name, weight), which interns
+        both names and allocates no Edge object.
+        """
+        if dest is None:
+            self.connect(edge.get_source(), edge.get_destination(),
+                         edge.get_weight())
+        else:
+            src = edge if isinstance(edge, Node) else self.intern(edge)
+            if not isinstance(dest, Node):
+                dest = self.intern(dest)
+            self.connect(src, dest, weight)
+
+    def connect(self, src, dest, weight=1.0):
+        """
+        Add an edge between two nodes already in the graph without
+        allocating an Edge object.
+        :param src: Node
+        :param dest: Node
+        :param weight: a number
+        """
+        if src not in self._edges or dest not in self._edges:
             raise ValueError("Node does not exist")
+        self._version += 1
         self._edges[src].append(dest)
+        self._weights[src].append(weight)
+        if not self._symmetric:
+            self._parents[dest].append(src)
+            self._parent_weights[dest].append(weight)
+        for listener in self._listeners:
+            listener.edge_added(src, dest, weight)
+
+    def set_weight(self, src, dest, weight):
+        """
+        Change the weight of the first src -> dest edge.
+        :param src: Node
+        :param dest: Node
+        :param weight: a number
+        """
+        try:
+            i = self._edges[src].index(dest)
+        except (KeyError, ValueError):
+            raise ValueError("Edge does not exist") from None
+        old = self._weights[src][i]
+        self._version += 1
+        self._weights[src][i] = weight
+        if not self._symmetric:
+            # parallel edges appear in the same order in both indexes
+            self._parent_weights[dest][self._parents[dest].index(src)] = weight
+        for listener in self._listeners:
+            listener.edge_weight_changed(src, dest, old, weight)
 
     def children_of(self, node):
         return self._edges[node]
 
+    def weights_of(self, node):
+        """
+        :return: list of edge weights, parallel to children_of(node)
+        """
+        return self._weights[node]
+
+    def weighted_children_of(self, node):
+        """
+        :return: iterator of (child, weight) pairs
+        """
+        return zip(self._edges[node], self._weights[node])
+
+    def parents_of(self, node):
+        return self._parents[node]
+
+    def weighted_parents_of(self, node):
+        """
+        :return: iterator of (parent, weight) pairs for incoming edges
+        """
+        return zip(self._parents[node], self._parent_weights[node])
+
     def has_node(self, node):
-        return node in self._nodes
+        return node in self._edges
+
+    def get_nodes(self):
+        """
+        :return: list of nodes in insertion order
+        """
+        return list(self._edges)
+
+    def __len__(self):
+        return len(self._edges)
+
+    def iter_edges(self, weights=False):
+        """
+        :param weights: bool, yield (src, dest, weight) triples
+        :return: generator of (src, dest) pairs in insertion order
+        """
+        for src, children in self._edges.items():
+            if weights:
+                yield from zip(repeat(src), children, self._weights[src])
+            else:
+                yield from zip(repeat(src), children)
+
+    def write_edges(self, fileobj, format='tsv', weights=True,
+                    chunk_size=8192):
+        """
+        Stream every edge to fileobj; see write_edges.
+        """
+        write_edges(self.iter_edges(weights), fileobj, format, chunk_size)
 
     def __str__(self):
-        result = ''
-        for src in self._nodes:
-            for dest in self._edges[src]:
-                result += src.get_name() + " -> " + dest.get_name() + '\n'
-        return result[:-1]  # omit final newline
+        return '\n'.join(src.get_name() + " -> " + dest.get_name()
+                         for src, dest in self.iter_edges())
 
     def get_edges(self):
-        result = []
-        for src in self._edges:
-            for dest in self._edges[src]:
-                result.append((src, dest))
-        return result
+        return list(self.iter_edges())
+
+    def freeze(self):
+        """
+        :return: Frozen_Digraph snapshot of the current graph
+        """
+        return Frozen_Digraph.from_digraph(self)
 
 
 class Graph(Digraph):
 
-    def add_edge(self, edge):
+    _symmetric = True
+
+    def parents_of(self, node):
+        return self._edges[node]
+
+    def weighted_parents_of(self, node):
+        return zip(self._edges[node], self._weights[node])
+
+    def connect(self, src, dest, weight=1.0):
         # add original direction
-        super().add_edge(edge)
+        super().connect(src, dest, weight)
         # add reverse direction
-        rev = Edge(edge.get_destination(), edge.get_source())
-        super().add_edge(rev)
+        super().connect(dest, src, weight)
+
+    def set_weight(self, src, dest, weight):
+        super().set_weight(src, dest, weight)
+        super().set_weight(dest, src, weight)
+
+
+class Frozen_Digraph(object):
+    """
+    Immutable compressed-sparse-row snapshot of a Digraph.
+    nodes is a list mapping dense integer ids to Nodes
+    index is a dict mapping node names to ids
+    the children of node i are targets[offsets[i]:offsets[i + 1]],
+    with the matching edge weights in the same slice of weights
+    """
+    def __init__(self, nodes, offsets, targets, weights):
+        """
+        :param nodes: list of Nodes with unique names
+        :param offsets: array of len(nodes) + 1 edge offsets
+        :param targets: array of child ids
+        :param weights: array of edge weights, parallel to targets
+        """
+        self._nodes = nodes
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._index = {node.get_name(): i for i, node in enumerate(nodes)}
+        if len(self._index) != len(nodes):
+            raise ValueError("Node names must be unique to freeze a graph")
+        self._reverse = None  # incoming-edge CSR, built on first use
+
+    @classmethod
+    def from_digraph(cls, graph):
+        """
+        :param graph: Digraph
+        :return: Frozen_Digraph with the same nodes, edges and weights
+        """
+        nodes = graph.get_nodes()
+        ids = {node: i for i, node in enumerate(nodes)}
+        offsets = array('q', [0])
+        targets = array('i' if len(nodes) < 2 ** 31 else 'q')
+        weights = array('d')
+        for node in nodes:
+            targets.extend(ids[child] for child in graph.children_of(node))
+            weights.extend(graph.weights_of(node))
+            offsets.append(len(targets))
+        return cls(nodes, offsets, targets, weights)
+
+    def get_version(self):
+        # a snapshot never changes
+        return 0
+
+    def subscribe(self, listener):
+        pass  # there are no mutations to report
+
+    def unsubscribe(self, listener):
+        pass
+
+    def id_of(self, node):
+        """
+        :param node: Node or node name
+        :return: dense integer id
+        """
+        if isinstance(node, Node):
+            node = node.get_name()
+        return self._index[node]
+
+    def node_at(self, node_id):
+        return self._nodes[node_id]
+
+    def get_node(self, name):
+        try:
+            return self._nodes[self._index[name]]
+        except KeyError:
+            raise NameError(name) from None
+
+    def num_edges(self):
+        return len(self._targets)
+
+    def csr_arrays(self):
+        """
+        :return: (offsets, targets, weights) read-only CSR arrays
+        """
+        return self._offsets, self._targets, self._weights
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def has_node(self, node):
+        i = self._index.get(node.get_name())
+        return i is not None and self._nodes[i] is node
+
+    def get_nodes(self):
+        return list(self._nodes)
+
+    def child_ids(self, node_id):
+        """
+        :return: array slice of child ids of node_id
+        """
+        return self._targets[self._offsets[node_id]:self._offsets[node_id + 1]]
+
+    def children_of(self, node):
+        nodes = self._nodes
+        return [nodes[c] for c in self.child_ids(self.id_of(node))]
+
+    def weights_of(self, node):
+        i = self.id_of(node)
+        return self._weights[self._offsets[i]:self._offsets[i + 1]]
+
+    def weighted_children_of(self, node):
+        return zip(self.children_of(node), self.weights_of(node))
+
+    def _reverse_csr(self):
+        """
+        :return: (offsets, sources, weights) arrays for incoming edges
+        """
+        if self._reverse is None:
+            n = len(self._nodes)
+            offsets, targets = self._offsets, self._targets
+            rev_offsets = array('q', [0]) * (n + 1)
+            for v in targets:
+                rev_offsets[v + 1] += 1
+            for i in range(n):
+                rev_offsets[i + 1] += rev_offsets[i]
+            fill = array('q', rev_offsets[:n])
+            # mmap-backed snapshots hold memoryviews, which have no typecode
+            typecode = getattr(targets, 'typecode', None) or targets.format
+            sources = array(typecode, [0]) * len(targets)
+            weights = array('d', [0.0]) * len(targets)
+            for u in range(n):
+                for e in range(offsets[u], offsets[u + 1]):
+                    slot = fill[targets[e]]
+                    sources[slot] = u
+                    weights[slot] = self._weights[e]
+                    fill[targets[e]] = slot + 1
+            self._reverse = (rev_offsets, sources, weights)
+        return self._reverse
+
+    def parents_of(self, node):
+        rev_offsets, sources, _ = self._reverse_csr()
+        i = self.id_of(node)
+        nodes = self._nodes
+        return [nodes[u] for u in sources[rev_offsets[i]:rev_offsets[i + 1]]]
+
+    def weighted_parents_of(self, node):
+        rev_offsets, _, weights = self._reverse_csr()
+        i = self.id_of(node)
+        return zip(self.parents_of(node),
+                   weights[rev_offsets[i]:rev_offsets[i + 1]])
+
+    def iter_edges(self, weights=False):
+        """
+        :param weights: bool, yield (src, dest, weight) triples
+        :return: generator of (src, dest) pairs in id order
+        """
+        nodes, offsets = self._nodes, self._offsets
+        targets, edge_weights = self._targets, self._weights
+        for i, src in enumerate(nodes):
+            for e in range(offsets[i], offsets[i + 1]):
+                if weights:
+                    yield src, nodes[targets[e]], edge_weights[e]
+                else:
+                    yield src, nodes[targets[e]]
+
+    def write_edges(self, fileobj, format='tsv', weights=True,
+                    chunk_size=8192):
+        """
+        Stream every edge to fileobj; see write_edges.
+        """
+        write_edges(self.iter_edges(weights), fileobj, format, chunk_size)
+
+    def __str__(self):
+        return '\n'.join(src.get_name() + " -> " + dest.get_name()
+                         for src, dest in self.iter_edges())
+
+    def get_edges(self):
+        return list(self.iter_edges())
+
+    def thaw(self):
+        """
+        :return: mutable Digraph sharing this snapshot's Node objects
+        """
+        graph = Digraph()
+        for node in self._nodes:
+            graph.add_node(node)
+        for i, node in enumerate(self._nodes):
+            for e in range(self._offsets[i], self._offsets[i + 1]):
+                graph.connect(node, self._nodes[self._targets[e]],
+                              self._weights[e])
+        return graph
+
+    def _path_from_parents(self, parent, end):
+        if parent[end] == -1:
+            return None
+        path = [end]
+        while parent[path[-1]] != path[-1]:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return [self._nodes[i] for i in path]
+
+    def _bfs_ids(self, s, t=-1):
+        """
+        :return: array mapping id -> BFS parent id (-1 unseen, s at root)
+        """
+        offsets, targets = self._offsets, self._targets
+        parent = array('q', [-1]) * len(self._nodes)
+        parent[s] = s
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            if u == t:
+                break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if parent[v] == -1:
+                    parent[v] = u
+                    queue.append(v)
+        return parent
+
+    def _dfs_ids(self, s, t):
+        """
+        Iterative DFS; stack holds (id, next edge offset) pairs.
+        :return: array mapping id -> DFS tree parent id
+        """
+        offsets, targets = self._offsets, self._targets
+        parent = array('q', [-1]) * len(self._nodes)
+        parent[s] = s
+        stack = [(s, offsets[s])]
+        while stack:
+            u, e = stack[-1]
+            if u == t:
+                break
+            if e == offsets[u + 1]:
+                stack.pop()
+                continue
+            stack[-1] = (u, e + 1)
+            v = targets[e]
+            if parent[v] == -1:
+                parent[v] = u
+                stack.append((v, offsets[v]))
+        return parent
+
+    def _dijkstra_ids(self, s, t=-1):
+        """
+        :return: (dist, parent) arrays indexed by id
+        """
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        n = len(self._nodes)
+        dist = array('d', [float('inf')]) * n
+        parent = array('q', [-1]) * n
+        dist[s] = 0.0
+        parent[s] = s
+        heap = [(0.0, s)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue  # stale heap entry
+            if u == t:
+                break
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                new_d = d + weights[e]
+                if new_d < dist[v]:
+                    dist[v] = new_d
+                    parent[v] = u
+                    heapq.heappush(heap, (new_d, v))
+        return dist, parent
+
+    def bfs_shortest_path(self, start, end):
+        """
+        :return: path with the fewest edges from start to end, or None
+        """
+        s, t = self.id_of(start), self.id_of(end)
+        return self._path_from_parents(self._bfs_ids(s, t), t)
+
+    def dfs_path(self, start, end):
+        """
+        :return: some path from start to end found depth-first, or None
+        """
+        s, t = self.id_of(start), self.id_of(end)
+        return self._path_from_parents(self._dfs_ids(s, t), t)
+
+    def dijkstra(self, start, end):
+        """
+        :return: (cost, path) of a cheapest path, or (inf, None)
+        """
+        s, t = self.id_of(start), self.id_of(end)
+        dist, parent = self._dijkstra_ids(s, t)
+        return dist[t], self._path_from_parents(parent, t)
+
+    def shortest_path_tree(self, source, weighted=True):
+        """
+        :param source: Node or node name
+        :param weighted: bool, sum weights (Dijkstra) or count hops (BFS)
+        :return: (dist, parent) arrays indexed by id; parent is -1 for
+            unreachable ids and the source's own id at the root
+        """
+        s = self.id_of(source)
+        if weighted:
+            return self._dijkstra_ids(s)
+        return self.distances_from(s, weighted=False), self._bfs_ids(s)
+
+    def path_in_tree(self, parent, end):
+        """
+        :param parent: parent array from shortest_path_tree
+        :param end: Node or node name
+        :return: list of nodes from the tree's root to end, or None
+        """
+        return self._path_from_parents(parent, self.id_of(end))
+
+    def distances_from(self, source, weighted=True):
+        """
+        :param source: Node, node name or id
+        :param weighted: bool, sum weights (Dijkstra) or count hops (BFS)
+        :return: array of distances indexed by id, inf if unreachable
+        """
+        s = source if isinstance(source, int) else self.id_of(source)
+        if weighted:
+            return self._dijkstra_ids(s)[0]
+        offsets, targets = self._offsets, self._targets
+        dist = array('d', [float('inf')]) * len(self._nodes)
+        dist[s] = 0.0
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1.0
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if d < dist[v]:
+                    dist[v] = d
+                    queue.append(v)
+        return dist
+
+
+def write_edges(edges, fileobj, format='tsv', chunk_size=8192):
+    """
+    Write edges as they are produced, joining chunk_size lines per write
+    call, so no full dump is ever built in memory.
+    :param edges: iterable of (src, dest) or (src, dest, weight) tuples
+    :param fileobj: open text file
+    :param format: 'tsv' (readable by load_edge_list) or 'jsonl'
+    :param chunk_size: lines per write call
+    """
+    if format == 'tsv':
+        def line(edge):
+            return '\t'.join(str(field) for field in edge) + '\n'
+    elif format == 'jsonl':
+        keys = ('src', 'dest', 'weight')
+
+        def line(edge):
+            fields = [edge[0].get_name(), edge[1].get_name()] + list(edge[2:])
+            return json.dumps(dict(zip(keys, fields))) + '\n'
+    else:
+        raise ValueError("Unknown format: " + str(format))
+    chunk = []
+    for edge in edges:
+        chunk.append(line(edge))
+        if len(chunk) >= chunk_size:
+            fileobj.write(''.join(chunk))
+            chunk.clear()
+    if chunk:
+        fileobj.write(''.join(chunk))
 
 
 def print_path(path):
@@ -140,15 +679,837 @@ def DFS(graph, start, end, path, shortest, to_print=False):
     return shortest
 
 
-def shortest_path(graph, start, end, to_print=False):
+def iter_simple_paths(graph, start, end, max_depth=None, max_cost=None):
     """
+    Lazily yield every simple path from start to end, depth-first, using
+    an explicit stack of child iterators instead of recursion.
     :param graph: Digraph
     :param start: Node
     :param end: Node
+    :param max_depth: most edges a path may have, or None
+    :param max_cost: largest total edge weight a path may have, or None
+    :return: generator of lists of nodes
+    """
+    if start == end:
+        yield [start]
+        return
+    path = [start]
+    costs = [0.0]  # costs[i] is the weight of path[:i + 1]
+    on_path = {start}
+    stack = [iter(graph.weighted_children_of(start))]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            costs.pop()
+            on_path.discard(path.pop())
+            continue
+        child, weight = step
+        if child in on_path:
+            continue  # avoid cycles
+        if max_depth is not None and len(path) > max_depth:
+            continue
+        cost = costs[-1] + weight
+        if max_cost is not None and cost > max_cost:
+            continue
+        if child == end:
+            yield path + [child]
+            continue
+        path.append(child)
+        costs.append(cost)
+        on_path.add(child)
+        stack.append(iter(graph.weighted_children_of(child)))
+
+
+def _bfs_parents(graph, start, end=None, to_print=False):
+    """
+    :param graph: Digraph
+    :param start: Node
+    :param end: Node to stop at, or None to visit everything reachable
     :param to_print: bool
+    :return: dict mapping each visited node to its BFS parent
+    """
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if to_print:
+            print("Current BFS node:", node)
+        if node == end:
+            break
+        for child in graph.children_of(node):
+            if child not in parent:  # parent doubles as the visited set
+                parent[child] = node
+                queue.append(child)
+    return parent
+
+
+def _rebuild_path(parent, end):
+    """
+    :param parent: dict mapping node -> predecessor (None at the root)
+    :param end: Node
+    :return: list of nodes from the root to end, or None if end unseen
+    """
+    if end not in parent:
+        return None
+    path = []
+    node = end
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def bfs_shortest_path(graph, start, end, to_print=False):
+    """
+    :param graph: Digraph
+    :param start: Node
+    :param end: Node
+    :param to_print: bool
+    :return: path with the fewest edges from start to end, or None
+    """
+    if isinstance(graph, Frozen_Digraph):
+        return graph.bfs_shortest_path(start, end)
+    return _rebuild_path(_bfs_parents(graph, start, end, to_print), end)
+
+
+def _astar_search(graph, start, end, heuristic=None, to_print=False,
+                  reverse=False):
+    """
+    Binary-heap best-first search over edge weights; plain Dijkstra when
+    heuristic is None.
+    :param graph: Digraph with non-negative edge weights
+    :param start: Node
+    :param end: Node to stop at once settled, or None to settle everything
+    :param heuristic: function (node, end) -> lower bound on remaining cost
+    :param to_print: bool
+    :param reverse: bool, follow incoming edges instead of outgoing ones
+    :return: (dist, parent) dicts for every node reached
+    """
+    if reverse:
+        neighbors = graph.weighted_parents_of
+    else:
+        neighbors = graph.weighted_children_of
+    dist = {start: 0.0}
+    parent = {start: None}
+    tie = count()  # Nodes are not orderable, so break heap ties by age
+    h = heuristic(start, end) if heuristic is not None else 0.0
+    heap = [(h, next(tie), 0.0, start)]
+    while heap:
+        _, _, d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue  # stale heap entry
+        if to_print:
+            print("Settled:", node, "cost:", d)
+        if node == end:
+            break
+        for child, weight in neighbors(node):
+            new_d = d + weight
+            if child not in dist or new_d < dist[child]:
+                dist[child] = new_d
+                parent[child] = node
+                if heuristic is not None:
+                    h = new_d + heuristic(child, end)
+                else:
+                    h = new_d
+                heapq.heappush(heap, (h, next(tie), new_d, child))
+    return dist, parent
+
+
+def dijkstra_distances(graph, source, reverse=False):
+    """
+    :param graph: Digraph with non-negative edge weights
+    :param source: Node
+    :param reverse: bool, measure distances to source instead of from it
+    :return: dict mapping every reachable node to its distance
+    """
+    return _astar_search(graph, source, None, reverse=reverse)[0]
+
+
+def dijkstra(graph, start, end, to_print=False):
+    """
+    :param graph: Digraph with non-negative edge weights
+    :param start: Node
+    :param end: Node
+    :param to_print: bool
+    :return: (cost, path) of a cheapest path, or (inf, None)
+    """
+    if isinstance(graph, Frozen_Digraph):
+        return graph.dijkstra(start, end)
+    dist, parent = _astar_search(graph, start, end, None, to_print)
+    if end not in dist:
+        return float('inf'), None
+    return dist[end], _rebuild_path(parent, end)
+
+
+def astar(graph, start, end, heuristic=None, to_print=False):
+    """
+    :param graph: Digraph with non-negative edge weights
+    :param start: Node
+    :param end: Node
+    :param heuristic: function (node, end) -> number that never
+        overestimates the remaining cost and is consistent along edges
+    :param to_print: bool
+    :return: (cost, path) of a cheapest path, or (inf, None)
+    """
+    dist, parent = _astar_search(graph, start, end, heuristic, to_print)
+    if end not in dist:
+        return float('inf'), None
+    return dist[end], _rebuild_path(parent, end)
+
+
+def _join_paths(fwd_parent, bwd_parent, meet):
+    """
+    :param fwd_parent: parent map of a search out of the start
+    :param bwd_parent: parent map of a backward search out of the end
+    :param meet: Node reached by both searches
+    :return: list of nodes start -> meet -> end
+    """
+    path = _rebuild_path(fwd_parent, meet)
+    node = bwd_parent[meet]
+    while node is not None:
+        path.append(node)
+        node = bwd_parent[node]
+    return path
+
+
+def bidirectional_bfs(graph, start, end, to_print=False):
+    """
+    Grow BFS levels from both ends, always expanding the smaller
+    frontier; the backward side follows incoming edges via parents_of.
+    :param graph: Digraph
+    :param start: Node
+    :param end: Node
+    :param to_print: bool
+    :return: path with the fewest edges from start to end, or None
+    """
+    if start == end:
+        return [start]
+    fwd_parent, bwd_parent = {start: None}, {end: None}
+    fwd_depth, bwd_depth = {start: 0}, {end: 0}
+    fwd_frontier, bwd_frontier = [start], [end]
+    while fwd_frontier and bwd_frontier:
+        if len(fwd_frontier) <= len(bwd_frontier):
+            frontier, neighbors = fwd_frontier, graph.children_of
+            parent, depth = fwd_parent, fwd_depth
+            other_depth = bwd_depth
+        else:
+            frontier, neighbors = bwd_frontier, graph.parents_of
+            parent, depth = bwd_parent, bwd_depth
+            other_depth = fwd_depth
+        if to_print:
+            print("Expanding", len(frontier), "nodes")
+        # finish the whole level so the best meeting point is kept
+        best, meet = None, None
+        next_frontier = []
+        for node in frontier:
+            for other in neighbors(node):
+                if other not in parent:
+                    parent[other] = node
+                    depth[other] = depth[node] + 1
+                    next_frontier.append(other)
+                if other in other_depth:
+                    length = depth[other] + other_depth[other]
+                    if best is None or length < best:
+                        best, meet = length, other
+        if frontier is fwd_frontier:
+            fwd_frontier = next_frontier
+        else:
+            bwd_frontier = next_frontier
+        if meet is not None:
+            return _join_paths(fwd_parent, bwd_parent, meet)
+    return None
+
+
+def bidirectional_dijkstra(graph, start, end, to_print=False):
+    """
+    Dijkstra from both ends, stopping once the two heap minima together
+    cannot beat the best start -> end cost already found.
+    :param graph: Digraph with non-negative edge weights
+    :param start: Node
+    :param end: Node
+    :param to_print: bool
+    :return: (cost, path) of a cheapest path, or (inf, None)
+    """
+    if start == end:
+        return 0.0, [start]
+    tie = count()
+    fwd = ({start: 0.0}, {start: None}, [(0.0, next(tie), start)],
+           graph.weighted_children_of)
+    bwd = ({end: 0.0}, {end: None}, [(0.0, next(tie), end)],
+           graph.weighted_parents_of)
+    best, meet = float('inf'), None
+    while fwd[2] and bwd[2]:
+        if fwd[2][0][0] + bwd[2][0][0] >= best:
+            break
+        side, other = (fwd, bwd) if fwd[2][0][0] <= bwd[2][0][0] \
+            else (bwd, fwd)
+        dist, parent, heap, neighbors = side
+        other_dist = other[0]
+        d, _, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue  # stale heap entry
+        if to_print:
+            print("Settled:", node, "cost:", d)
+        for child, weight in neighbors(node):
+            new_d = d + weight
+            if child not in dist or new_d < dist[child]:
+                dist[child] = new_d
+                parent[child] = node
+                heapq.heappush(heap, (new_d, next(tie), child))
+            if child in other_dist:
+                total = dist[child] + other_dist[child]
+                if total < best:
+                    best, meet = total, child
+    if meet is None:
+        return float('inf'), None
+    return best, _join_paths(fwd[1], bwd[1], meet)
+
+
+def _spur_search(graph, start, end, to_end, blocked_nodes, blocked_edges):
+    """
+    A* from start to end that skips blocked nodes and (src, dest) edges.
+    to_end holds exact distances to end in the unblocked graph; removing
+    edges can only lengthen paths, so they remain a consistent heuristic.
+    :return: (path, cumulative costs along it), or None
+    """
+    dist = {start: 0.0}
+    parent = {start: None}
+    tie = count()
+    heap = [(to_end[start], next(tie), 0.0, start)]
+    while heap:
+        _, _, d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue  # stale heap entry
+        if node == end:
+            path = _rebuild_path(parent, end)
+            return path, [dist[step] for step in path]
+        for child, weight in graph.weighted_children_of(node):
+            if (child in blocked_nodes or child not in to_end
+                    or (node, child) in blocked_edges):
+                continue
+            new_d = d + weight
+            if child not in dist or new_d < dist[child]:
+                dist[child] = new_d
+                parent[child] = node
+                heapq.heappush(heap, (new_d + to_end[child], next(tie),
+                                      new_d, child))
+    return None
+
+
+def k_shortest_paths(graph, start, end, k=None):
+    """
+    Yen's algorithm: lazily yield loopless paths from start to end in
+    order of increasing cost. One backward Dijkstra from end is shared by
+    every spur search, both for the first path and as an exact A*
+    heuristic, so each later path costs a few short guided searches.
+    :param graph: Digraph with non-negative edge weights
+    :param start: Node
+    :param end: Node
+    :param k: most paths to yield, or None for all of them
+    :return: generator of (cost, path) pairs
+    """
+    to_end, next_hop = _astar_search(graph, end, None, reverse=True)
+    if start not in to_end or k == 0:
+        return
+    path = _rebuild_path(next_hop, start)
+    path.reverse()
+    costs = [to_end[start] - to_end[node] for node in path]
+    found = [(path, costs)]
+    yield costs[-1], path
+    seen = {tuple(path)}
+    candidates = []
+    tie = count()
+    while k is None or len(found) < k:
+        path, costs = found[-1]
+        for i in range(len(path) - 1):
+            root = path[:i + 1]
+            blocked_edges = {(other[i], other[i + 1]) for other, _ in found
+                             if len(other) > i + 1 and other[:i + 1] == root}
+            spur = _spur_search(graph, path[i], end, to_end,
+                                set(root[:-1]), blocked_edges)
+            if spur is None:
+                continue
+            spur_path, spur_costs = spur
+            candidate = root[:-1] + spur_path
+            if tuple(candidate) in seen:
+                continue
+            seen.add(tuple(candidate))
+            candidate_costs = costs[:i] + [costs[i] + c for c in spur_costs]
+            heapq.heappush(candidates, (candidate_costs[-1], next(tie),
+                                        candidate, candidate_costs))
+        if not candidates:
+            return
+        cost, _, path, costs = heapq.heappop(candidates)
+        found.append((path, costs))
+        yield cost, path
+
+
+_SP_ALGORITHMS = {
+    'dfs': lambda graph, start, end, to_print:
+        DFS(graph, start, end, [], None, to_print),
+    'bfs': bfs_shortest_path,
+    'dijkstra': lambda graph, start, end, to_print:
+        dijkstra(graph, start, end, to_print)[1],
+    'bidirectional_bfs': bidirectional_bfs,
+    'bidirectional_dijkstra': lambda graph, start, end, to_print:
+        bidirectional_dijkstra(graph, start, end, to_print)[1],
+}
+
+
+def shortest_path(graph, start, end, to_print=False, algorithm='dfs',
+                  prefilter=None):
+    """
+    :param graph: Digraph
+    :param start: Node
+    :param end: Node
+    :param to_print: bool
+    :param algorithm: one of 'dfs', 'bfs', 'dijkstra',
+        'bidirectional_bfs', 'bidirectional_dijkstra'
+    :param prefilter: Condensation of graph; when it is current and
+        rules the pair out, None is returned without searching
     :return: shortest path from start to end
     """
-    return DFS(graph, start, end, [], None, to_print)
+    try:
+        search = _SP_ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError("Unknown algorithm: " + str(algorithm)) from None
+    if (prefilter is not None and prefilter.is_current()
+            and not prefilter.may_reach(start, end)):
+        return None
+    return search(graph, start, end, to_print)
+
+
+def strongly_connected_components(graph):
+    """
+    Iterative Tarjan: an explicit stack of (node, child iterator) pairs
+    replaces recursion, so depth is not limited by the interpreter.
+    :param graph: Digraph
+    :return: list of components (lists of nodes) in reverse topological
+        order, i.e. every edge between components points to an earlier one
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = count()
+    for root in graph.get_nodes():
+        if root in index:
+            continue
+        index[root] = low[root] = next(counter)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.children_of(root)))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = next(counter)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.children_of(child))))
+                    break
+                if child in on_stack and index[child] < low[node]:
+                    low[node] = index[child]
+            else:
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+class Condensation(object):
+    """
+    DAG of the strongly connected components of a Digraph.
+    component maps each node to its component id; ids follow
+    strongly_connected_components, so edges only go to lower ids
+    dag is a list mapping each component id to its successor ids
+    level is the longest distance (in components) to a sink
+    """
+    def __init__(self, graph):
+        """
+        :param graph: Digraph
+        """
+        self._graph = graph
+        self._version = graph.get_version()
+        self._components = strongly_connected_components(graph)
+        self._component = {}
+        for cid, members in enumerate(self._components):
+            for node in members:
+                self._component[node] = cid
+        self._dag = [set() for _ in self._components]
+        for cid, members in enumerate(self._components):
+            for node in members:
+                for child in graph.children_of(node):
+                    other = self._component[child]
+                    if other != cid:
+                        self._dag[cid].add(other)
+        # successors have lower ids, so one pass in id order suffices
+        self._level = [0] * len(self._components)
+        for cid, successors in enumerate(self._dag):
+            for other in successors:
+                if self._level[other] + 1 > self._level[cid]:
+                    self._level[cid] = self._level[other] + 1
+
+    def is_current(self):
+        """
+        :return: True if the graph has not changed since this was built
+        """
+        return self._graph.get_version() == self._version
+
+    def component_of(self, node):
+        return self._component[node]
+
+    def get_components(self):
+        return self._components
+
+    def successors(self, cid):
+        return self._dag[cid]
+
+    def __len__(self):
+        return len(self._components)
+
+    def same_component(self, a, b):
+        """
+        :return: True if a and b can reach each other
+        """
+        return self._component[a] == self._component[b]
+
+    def may_reach(self, a, b):
+        """
+        O(1) necessary condition for a path from a to b: False means no
+        path exists, True means one might.
+        """
+        ca, cb = self._component[a], self._component[b]
+        if ca == cb:
+            return True
+        return ca > cb and self._level[ca] > self._level[cb]
+
+    def to_digraph(self):
+        """
+        :return: Digraph with one node per component, named by its id
+        """
+        dag = Digraph()
+        nodes = [Node(str(cid)) for cid in range(len(self._components))]
+        for node in nodes:
+            dag.add_node(node)
+        for cid, successors in enumerate(self._dag):
+            for other in sorted(successors):
+                dag.connect(nodes[cid], nodes[other])
+        return dag
+
+
+class Reachability_Index(object):
+    """
+    Answers "can a reach b?" in O(1) from labels on the condensation.
+    component maps each node to a component id
+    With compress='bitset', reach[c] is a Python int whose bit d is set
+    when component c reaches component d.
+    With compress='chain', the DAG is split into chains; chain_of[c] is
+    (chain id, position) and label[c] maps each chain id to the lowest
+    position c reaches on it, which is much smaller than a bitset when
+    the DAG is narrow.
+    The index subscribes to the graph: bitset labels are patched in
+    place on every add_node/add_edge, chain labels are rebuilt on the
+    first query after a change.
+    """
+    def __init__(self, graph, compress='bitset'):
+        """
+        :param graph: Digraph
+        :param compress: 'bitset' or 'chain'
+        """
+        if compress not in ('bitset', 'chain'):
+            raise ValueError("Unknown compression: " + str(compress))
+        self._graph = graph
+        self._compress = compress
+        self._build()
+        graph.subscribe(self)
+
+    def _build(self):
+        condensation = Condensation(self._graph)
+        self._component = condensation._component
+        dag = condensation._dag
+        if self._compress == 'bitset':
+            # successors have lower ids, so they are finished first
+            self._reach = []
+            for cid, successors in enumerate(dag):
+                bits = 1 << cid
+                for other in successors:
+                    bits |= self._reach[other]
+                self._reach.append(bits)
+        else:
+            self._build_chains(dag)
+        self._dirty = False
+
+    def _build_chains(self, dag):
+        # greedy chain cover, walking components in topological order
+        self._chain_of = [None] * len(dag)
+        chain_id = 0
+        for cid in reversed(range(len(dag))):
+            if self._chain_of[cid] is not None:
+                continue
+            position = 0
+            current = cid
+            while current is not None:
+                self._chain_of[current] = (chain_id, position)
+                position += 1
+                free = [c for c in dag[current] if self._chain_of[c] is None]
+                current = max(free) if free else None
+            chain_id += 1
+        self._label = []
+        for cid, successors in enumerate(dag):
+            chain, position = self._chain_of[cid]
+            label = {chain: position}
+            for other in successors:
+                for other_chain, other_pos in self._label[other].items():
+                    if other_pos < label.get(other_chain, other_pos + 1):
+                        label[other_chain] = other_pos
+            self._label.append(label)
+
+    def reachable(self, a, b):
+        """
+        :param a: Node
+        :param b: Node
+        :return: True if there is a path from a to b
+        """
+        if self._dirty:
+            self._build()
+        ca, cb = self._component[a], self._component[b]
+        if self._compress == 'bitset':
+            return (self._reach[ca] >> cb) & 1 == 1
+        chain, position = self._chain_of[cb]
+        lowest = self._label[ca].get(chain)
+        return lowest is not None and lowest <= position
+
+    def node_added(self, node):
+        if self._compress == 'bitset':
+            self._component[node] = len(self._reach)
+            self._reach.append(1 << len(self._reach))
+        else:
+            self._dirty = True
+
+    def edge_added(self, src, dest, weight):
+        if self._compress != 'bitset':
+            self._dirty = True
+            return
+        cs, cd = self._component[src], self._component[dest]
+        if (self._reach[cs] >> cd) & 1:
+            return  # dest was already reachable from src
+        # everything that reaches src now reaches all dest reaches
+        gained = self._reach[cd]
+        for cid, bits in enumerate(self._reach):
+            if (bits >> cs) & 1:
+                self._reach[cid] = bits | gained
+
+    def edge_weight_changed(self, src, dest, old, new):
+        pass  # weights do not affect reachability
+
+    def close(self):
+        """
+        Stop following graph mutations.
+        """
+        self._graph.unsubscribe(self)
+
+
+class Dynamic_SSSP(object):
+    """
+    Single-source shortest paths kept in step with a growing graph.
+    dist maps each reachable node to its distance from source
+    parent maps each reachable node to its predecessor on a shortest path
+    On edge_added, or a weight decrease, only nodes whose distance drops
+    are revisited: a Dijkstra (or BFS, when unweighted) restarted from
+    the improved endpoint. A weight increase may lengthen paths anywhere
+    in the affected subtree, so it triggers a full recompute.
+    """
+    def __init__(self, graph, source, weighted=True):
+        """
+        :param graph: Digraph
+        :param source: Node
+        :param weighted: bool, sum weights or count hops
+        """
+        self._graph = graph
+        self._source = source
+        self._weighted = weighted
+        self._recompute()
+        graph.subscribe(self)
+
+    def _recompute(self):
+        self._dist = {self._source: 0.0}
+        self._parent = {self._source: None}
+        self._relax_from([self._source])
+
+    def _relax_from(self, improved):
+        """
+        Dijkstra restarted from nodes whose distance just dropped.
+        """
+        dist, parent = self._dist, self._parent
+        tie = count()
+        heap = [(dist[node], next(tie), node) for node in improved]
+        heapq.heapify(heap)
+        while heap:
+            d, _, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue  # stale heap entry
+            for child, weight in self._graph.weighted_children_of(node):
+                new_d = d + (weight if self._weighted else 1.0)
+                if child not in dist or new_d < dist[child]:
+                    dist[child] = new_d
+                    parent[child] = node
+                    heapq.heappush(heap, (new_d, next(tie), child))
+
+    def distance_to(self, node):
+        """
+        :return: current distance from source to node, inf if unreachable
+        """
+        return self._dist.get(node, float('inf'))
+
+    def path_to(self, node):
+        """
+        :return: current shortest path from source to node, or None
+        """
+        return _rebuild_path(self._parent, node)
+
+    def node_added(self, node):
+        pass  # a new node has no edges yet, so nothing moves
+
+    def edge_added(self, src, dest, weight):
+        if src not in self._dist:
+            return
+        new_d = self._dist[src] + (weight if self._weighted else 1.0)
+        if dest not in self._dist or new_d < self._dist[dest]:
+            self._dist[dest] = new_d
+            self._parent[dest] = src
+            self._relax_from([dest])
+
+    def edge_weight_changed(self, src, dest, old, new):
+        if not self._weighted or new == old:
+            return
+        if new < old:
+            self.edge_added(src, dest, new)
+        else:
+            self._recompute()
+
+    def close(self):
+        """
+        Stop following graph mutations.
+        """
+        self._graph.unsubscribe(self)
+
+
+# algorithms whose single-source search tree answers every target
+_SP_TREES = {
+    'bfs': lambda graph, start: _bfs_parents(graph, start),
+    'dijkstra': lambda graph, start: _astar_search(graph, start, None)[1],
+}
+
+_MISSING = object()
+
+
+class Path_Cache(object):
+    """
+    Bounded LRU cache of shortest_path answers for one graph.
+    queries maps (version, start, end, algorithm) to a path tuple
+    trees maps (version, start, algorithm) to a parent map, so any
+    target from a cached source is rebuilt in O(path length)
+    Both are dropped as soon as the graph's version moves on.
+    """
+    def __init__(self, graph, maxsize=1024, max_trees=16):
+        """
+        :param graph: Digraph or Frozen_Digraph
+        :param maxsize: most query answers to keep
+        :param max_trees: most single-source trees to keep
+        """
+        self._graph = graph
+        self._maxsize = maxsize
+        self._max_trees = max_trees
+        self._version = graph.get_version()
+        self._queries = OrderedDict()
+        self._trees = OrderedDict()
+        self.hits = 0
+        self.tree_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        version = self._graph.get_version()
+        if version != self._version:
+            if self._queries or self._trees:
+                self.invalidations += 1
+            self._queries.clear()
+            self._trees.clear()
+            self._version = version
+
+    def _remember(self, table, key, value, limit):
+        table[key] = value
+        if len(table) > limit:
+            table.popitem(last=False)
+            self.evictions += 1
+
+    def shortest_path(self, start, end, algorithm='bfs'):
+        """
+        :param start: Node
+        :param end: Node
+        :param algorithm: any algorithm accepted by shortest_path
+        :return: shortest path from start to end, or None
+        """
+        self._check_version()
+        key = (self._version, start, end, algorithm)
+        path = self._queries.get(key, _MISSING)
+        if path is not _MISSING:
+            self._queries.move_to_end(key)
+            self.hits += 1
+            return None if path is None else list(path)
+        if algorithm in _SP_TREES:
+            tree_key = (self._version, start, algorithm)
+            parent = self._trees.get(tree_key)
+            if parent is not None:
+                self._trees.move_to_end(tree_key)
+                self.tree_hits += 1
+            else:
+                self.misses += 1
+                parent = _SP_TREES[algorithm](self._graph, start)
+                self._remember(self._trees, tree_key, parent,
+                               self._max_trees)
+            path = _rebuild_path(parent, end)
+        else:
+            self.misses += 1
+            path = shortest_path(self._graph, start, end,
+                                 algorithm=algorithm)
+        # kept as a tuple and handed out as fresh lists, so callers may
+        # change the path they get back without touching the cache
+        self._remember(self._queries, key,
+                       None if path is None else tuple(path), self._maxsize)
+        return path
+
+    def clear(self):
+        self._queries.clear()
+        self._trees.clear()
+
+    def stats(self):
+        """
+        :return: dict of counters and current sizes
+        """
+        return {
+            'hits': self.hits,
+            'tree_hits': self.tree_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'queries': len(self._queries),
+            'trees': len(self._trees),
+        }
 
 
 def test_SP():
@@ -173,3 +1534,5 @@ def test_SP():
 
     sp = shortest_path(g, nodes[0], nodes[5], to_print=True)
     print('Shortest path found by DFS:', print_path(sp))
+    sp = shortest_path(g, nodes[0], nodes[5], algorithm='bfs')
+    print('Shortest path found by BFS:', print_path(sp))
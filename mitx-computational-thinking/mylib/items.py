@@ -1,5 +1,7 @@
 import random
 
+import numpy as np
+
 class Item(object):
     def __init__(self, n, w, v):
         self._name = n
@@ -37,3 +39,88 @@ def build_many_items(num_items, max_val, max_weight):
             )
         )
     return items
+
+
+class ItemSet(object):
+    """
+    Items stored as NumPy columns (names, values, weights) rather than
+    one Item object each, so solvers can work on whole arrays.
+    Slicing returns an ItemSet of views on the same columns.
+    """
+    def __init__(self, names, values, weights):
+        """
+        :param names: sequence of names
+        :param values: sequence of numbers
+        :param weights: sequence of numbers
+        """
+        self._names = np.asarray(names, dtype=object)
+        self._values = np.asarray(values)
+        self._weights = np.asarray(weights)
+        if not len(self._names) == len(self._values) == len(self._weights):
+            raise ValueError("columns must have the same length")
+
+    @classmethod
+    def from_items(cls, items, get_val=Item.get_value,
+                   get_weight=Item.get_weight):
+        """
+        :param items: iterable of Item (or anything get_val/get_weight
+            accept; names are taken from get_name)
+        """
+        items = list(items)
+        return cls([it.get_name() for it in items],
+                   [get_val(it) for it in items],
+                   [get_weight(it) for it in items])
+
+    @classmethod
+    def random(cls, num_items, max_val, max_weight, seed=None):
+        """
+        Vectorised counterpart of build_many_items: integer values in
+        1..max_val and weights in 1..max_weight, named '0', '1', ...
+        :param seed: seed for np.random.default_rng
+        """
+        rng = np.random.default_rng(seed)
+        return cls(np.arange(num_items).astype(str),
+                   rng.integers(1, max_val + 1, num_items),
+                   rng.integers(1, max_weight + 1, num_items))
+
+    def get_names(self):   return self._names
+    def get_values(self):  return self._values
+    def get_weights(self): return self._weights
+
+    def get_densities(self):
+        """:return: float array of value / weight (inf for weight 0)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._values / self._weights
+
+    def sort_by_density(self, descending=True):
+        """:return: new ItemSet ordered by value density"""
+        order = np.argsort(self.get_densities(), kind='stable')
+        if descending:
+            order = order[::-1]
+        return self[order]
+
+    def to_items(self):
+        return [self[i] for i in range(len(self))]
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key):
+        """
+        An integer gives an Item; a slice gives views on the columns;
+        an index or boolean array gives a copied subset.
+        """
+        if isinstance(key, (int, np.integer)):
+            return Item(self._names[key], self._weights[key].item(),
+                        self._values[key].item())
+        return ItemSet(self._names[key], self._values[key],
+                       self._weights[key])
+
+    def __str__(self):
+        return ''.join(str(it) for it in self)
+
+    __repr__ = __str__
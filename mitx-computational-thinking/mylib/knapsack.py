@@ -1,4 +1,12 @@
-from .items import Item
+import multiprocessing
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .items import Item, ItemSet
+from .utils import gray_code_flips
 
 def gen_powerset(items, constraint, get_val, get_weight):
     """Yield all subsets with total weight <= constraint (early pruning)."""
@@ -49,3 +57,398 @@ def test_best(max_weight=20):
     best_val = sum(Item.get_value(x) for x in best_set)
     return best_set, best_val
 
+
+def _columns(items, get_val, get_weight):
+    """
+    :return: (values, weights) as float arrays; an ItemSet's own columns
+        are used as they are, without calling the accessors
+    """
+    if isinstance(items, ItemSet):
+        return items.get_values(), items.get_weights()
+    return (np.array([get_val(it) for it in items], dtype=float),
+            np.array([get_weight(it) for it in items], dtype=float))
+
+
+def _pick(items, indices):
+    """:return: the items at indices, as an ItemSet for an ItemSet"""
+    if isinstance(items, ItemSet):
+        return items[np.asarray(indices, dtype=np.intp)]
+    return [items[i] for i in indices]
+
+
+def _dp_table(values, weights, capacity):
+    """
+    Bottom-up 0/1 knapsack over integer capacities 0..capacity.
+    :return: (best, taken) where best[c] is the best value within
+        capacity c and taken is an n x ceil((capacity + 1) / 8) uint8
+        table whose bit (i, c) says item i is in the optimum of the
+        first i + 1 items at capacity c
+    """
+    if np.any(weights < 0) or np.any(weights != np.floor(weights)):
+        raise ValueError("dp_knapsack needs non-negative integer weights")
+    if capacity < 0:
+        raise ValueError("capacity must be non-negative")
+    capacity = int(capacity)
+    best = np.zeros(capacity + 1)
+    taken = np.zeros((len(weights), (capacity + 8) // 8), dtype=np.uint8)
+    row = np.zeros(capacity + 1, dtype=bool)
+    for i, (w, v) in enumerate(zip(weights.tolist(), values.tolist())):
+        w = int(w)
+        if w > capacity:
+            continue
+        # every capacity c >= w at once: take the item if best[c - w] + v
+        # beats the current best[c]
+        cand = best[:capacity + 1 - w] + v
+        take = cand > best[w:]
+        row[:w] = False
+        row[w:] = take
+        taken[i] = np.packbits(row)
+        best[w:] = np.where(take, cand, best[w:])
+    return best, taken
+
+
+def _dp_indices(weights, taken, capacity):
+    """Walk the decision bits back from capacity to the chosen indices."""
+    chosen = []
+    c = int(capacity)
+    for i in range(len(weights) - 1, -1, -1):
+        if (taken[i, c >> 3] >> (7 - (c & 7))) & 1:
+            chosen.append(i)
+            c -= int(weights[i])
+    chosen.reverse()
+    return chosen
+
+
+def dp_knapsack(items, max_weight, get_val=Item.get_value,
+                get_weight=Item.get_weight):
+    """
+    Exact 0/1 knapsack for integer weights in O(n * max_weight) time,
+    with the value table as one NumPy row and the decisions bit-packed,
+    so memory is O(n * max_weight / 8) bytes.
+    :param items: list of items, or an ItemSet
+    :return: (best_set, best_val), like choose_best
+    """
+    if max_weight < 0:
+        return _pick(items, []), 0.0  # nothing fits, as in choose_best
+    values, weights = _columns(items, get_val, get_weight)
+    best, taken = _dp_table(values, weights, max_weight)
+    return (_pick(items, _dp_indices(weights, taken, max_weight)),
+            float(best[int(max_weight)]))
+
+
+class Capacity_Curve(object):
+    """
+    Optimal knapsack values for every capacity 0..max_weight from one DP
+    pass. The chosen items for a capacity are rebuilt from the shared
+    decision table only when asked for.
+    """
+    def __init__(self, items, weights, best, taken):
+        self._items = items
+        self._weights = weights
+        self._best = best
+        self._taken = taken
+
+    def get_values(self):
+        """:return: float array, best value for each capacity 0..W"""
+        return self._best
+
+    def best_value(self, capacity):
+        return float(self._best[self._capacity(capacity)])
+
+    def best_set(self, capacity):
+        """:return: the items of an optimum at capacity, like choose_best"""
+        capacity = self._capacity(capacity)
+        return _pick(self._items,
+                     _dp_indices(self._weights, self._taken, capacity))
+
+    def solve(self, capacity):
+        """:return: (best_set, best_val) for one capacity"""
+        return self.best_set(capacity), self.best_value(capacity)
+
+    def _capacity(self, capacity):
+        capacity = int(capacity)
+        if not 0 <= capacity < len(self._best):
+            raise ValueError("capacity outside 0.." +
+                             str(len(self._best) - 1))
+        return capacity
+
+    def __len__(self):
+        return len(self._best)
+
+
+def solve_all_capacities(items, max_weight, get_val=Item.get_value,
+                         get_weight=Item.get_weight):
+    """
+    Solve the integer-weight knapsack for every budget 0..max_weight at
+    the cost of one dp_knapsack call.
+    :param items: list of items, or an ItemSet
+    :return: Capacity_Curve
+    """
+    values, weights = _columns(items, get_val, get_weight)
+    best, taken = _dp_table(values, weights, max_weight)
+    return Capacity_Curve(items, weights, best, taken)
+
+
+def bb_knapsack(items, max_weight, get_val=Item.get_value,
+                get_weight=Item.get_weight, stats=None):
+    """
+    Exact 0/1 knapsack by depth-first branch and bound, for weights
+    (real-valued or large) where dp_knapsack is impractical. Items are
+    taken in order of value density; a subtree is pruned when its
+    fractional-knapsack bound cannot beat the incumbent, which starts as
+    the greedy solution.
+    :param items: list of items, or an ItemSet
+    :param stats: optional dict; 'nodes' is set to the nodes expanded
+    :return: (best_set, best_val), like choose_best
+    """
+    values, weights = _columns(items, get_val, get_weight)
+    useful = (values > 0) & (weights <= max_weight)
+    free = np.flatnonzero(useful & (weights <= 0))  # value at no cost
+    base_val = float(values[free].sum())
+    idx = np.flatnonzero(useful & (weights > 0))
+    idx = idx[np.argsort(-(values[idx] / weights[idx]), kind='stable')]
+    ws = weights[idx].tolist()
+    vs = values[idx].tolist()
+    n = len(ws)
+    # prefix sums make each bound a binary search instead of a scan
+    cum_w, cum_v = [0.0] * (n + 1), [0.0] * (n + 1)
+    for k in range(n):
+        cum_w[k + 1] = cum_w[k] + ws[k]
+        cum_v[k + 1] = cum_v[k] + vs[k]
+
+    def bound(k, room):
+        # best fractional value obtainable from items k.. within room
+        j = bisect_right(cum_w, cum_w[k] + room, k) - 1
+        extra = cum_v[j] - cum_v[k]
+        if j < n:
+            extra += vs[j] * (room - (cum_w[j] - cum_w[k])) / ws[j]
+        return extra
+
+    # greedy incumbent
+    best_val, best_taken, room = 0.0, [], max_weight
+    for k in range(n):
+        if ws[k] <= room:
+            room -= ws[k]
+            best_val += vs[k]
+            best_taken.append(k)
+
+    expanded = 0
+    # (next item, room left, value so far, chosen items as a linked list)
+    stack = [(0, max_weight, 0.0, None)]
+    while stack:
+        k, room, val, chain = stack.pop()
+        if k == n or val + bound(k, room) <= best_val:
+            continue
+        expanded += 1
+        # skip k is pushed first so that taking k is explored first
+        stack.append((k + 1, room, val, chain))
+        if ws[k] <= room:
+            val += vs[k]
+            chain = (k, chain)
+            if val > best_val:
+                best_val, best_taken = val, chain
+            stack.append((k + 1, room - ws[k], val, chain))
+
+    if isinstance(best_taken, tuple):
+        chain, best_taken = best_taken, []
+        while chain is not None:
+            best_taken.append(chain[0])
+            chain = chain[1]
+    if stats is not None:
+        stats['nodes'] = expanded
+    chosen = sorted(free.tolist() + idx[best_taken].tolist())
+    return _pick(items, chosen), base_val + best_val
+
+
+def _subset_sums(weights, values):
+    """
+    Weight and value of every subset of one half, indexed by bitmask.
+    Each mask is the mask without its top bit plus one item, so the
+    table doubles per item with a single vectorised add.
+    """
+    w = np.zeros(1 << len(weights))
+    v = np.zeros(1 << len(weights))
+    for j, (wj, vj) in enumerate(zip(weights, values)):
+        size = 1 << j
+        w[size:2 * size] = w[:size] + wj
+        v[size:2 * size] = v[:size] + vj
+    return w, v
+
+
+def mitm_knapsack(items, max_weight, get_val=Item.get_value,
+                  get_weight=Item.get_weight):
+    """
+    Exact 0/1 knapsack by meet in the middle, for real-valued weights and
+    roughly 30 to 50 items: O(2^(n/2) * n) time and O(2^(n/2)) memory
+    instead of the 2^n subsets of gen_powerset.
+    :param items: list of items, or an ItemSet
+    :return: (best_set, best_val), like choose_best
+    """
+    values, weights = _columns(items, get_val, get_weight)
+    n = len(weights)
+    half = n // 2
+    wa, va = _subset_sums(weights[:half], values[:half])
+    wb, vb = _subset_sums(weights[half:], values[half:])
+    # Pareto frontier of the second half: by increasing weight, keep a
+    # subset only if it is worth more than everything lighter
+    masks_b = np.flatnonzero(wb <= max_weight)
+    masks_b = masks_b[np.lexsort((-vb[masks_b], wb[masks_b]))]
+    vals = vb[masks_b]
+    lighter = np.maximum.accumulate(vals)
+    keep = np.ones(len(vals), dtype=bool)
+    keep[1:] = vals[1:] > lighter[:-1]
+    masks_b = masks_b[keep]
+    front_w, front_v = wb[masks_b], vb[masks_b]
+
+    # pair every feasible first-half subset with the best frontier entry
+    # that fits in the room it leaves
+    masks_a = np.flatnonzero(wa <= max_weight)
+    j = np.searchsorted(front_w, max_weight - wa[masks_a], side='right') - 1
+    fits = j >= 0  # -1 means no second-half subset fits the room left
+    masks_a, j = masks_a[fits], j[fits]
+    if len(masks_a) == 0:
+        return _pick(items, []), 0.0
+    totals = va[masks_a] + front_v[j]
+    k = int(np.argmax(totals))
+    if totals[k] <= 0:
+        return _pick(items, []), 0.0
+    mask = int(masks_a[k]) | (int(masks_b[j[k]]) << half)
+    return (_pick(items, [i for i in range(n) if mask >> i & 1]),
+            float(totals[k]))
+
+
+# per-process shard inputs, set once by _init_shard_worker
+_shard_state = None
+
+
+def _init_shard_worker(values, weights, max_weight, shared_best, prune):
+    global _shard_state
+    _shard_state = (values, weights, max_weight, shared_best, prune)
+
+
+def _run_shard(shard, k):
+    """
+    Enumerate the subtree of gen_powerset's backtracking tree whose first
+    k skip/take decisions are the bits of shard (item 0 most significant)
+    :return: (best_val, best indices or None, feasible subsets checked)
+    """
+    values, weights, max_weight, shared_best, prune = _shard_state
+    n = len(values)
+    chosen = [j for j in range(k) if shard >> (k - 1 - j) & 1]
+    cur_wt = 0.0
+    cur_val = 0.0
+    for j in chosen:
+        cur_wt += weights[j]
+        cur_val += values[j]
+    if cur_wt > max_weight:
+        return 0.0, None, 0
+    # most any remaining items can add, for pruning against the global best
+    upper = [0.0] * (n + 1)
+    for j in range(n - 1, -1, -1):
+        upper[j] = upper[j + 1] + max(values[j], 0.0)
+
+    best = [0.0, None]
+    count = 0
+    known = shared_best.value
+
+    def publish(val):
+        nonlocal known
+        with shared_best.get_lock():
+            if val > shared_best.value:
+                shared_best.value = val
+            known = shared_best.value
+
+    def backtrack(idx, wt, val):
+        nonlocal count, known
+        if wt > max_weight:
+            return
+        if prune and val + upper[idx] <= known:
+            return
+        if idx == n:
+            count += 1
+            if val > best[0]:
+                best[0], best[1] = val, list(chosen)
+                if prune:
+                    publish(val)
+            elif prune and count & 1023 == 0:
+                known = shared_best.value
+            return
+        backtrack(idx + 1, wt, val)  # skip
+        chosen.append(idx)  # take
+        backtrack(idx + 1, wt + weights[idx], val + values[idx])
+        chosen.pop()
+
+    backtrack(k, cur_wt, cur_val)
+    return best[0], best[1], count
+
+
+def parallel_choose_best(items, max_weight, get_val=Item.get_value,
+                         get_weight=Item.get_weight, k=None, workers=None,
+                         prune=True, stats=None):
+    """
+    choose_best(gen_powerset(...)) split into 2^k shards by fixing the
+    first k skip/take decisions, each shard enumerated in a worker
+    process and the per-shard bests reduced at the end.
+    :param k: number of fixed decisions; by default enough for about
+        four shards per worker
+    :param workers: process count, or None for the CPU count
+    :param prune: bool, share the best value found so far between shards
+        and cut subtrees that cannot beat it; False visits every feasible
+        subset, for auditing
+    :param stats: optional dict; 'subsets' is set to the number of
+        complete feasible subsets checked
+    :return: (best_set, best_val), like choose_best
+    """
+    values, weights = _columns(items, get_val, get_weight)
+    values, weights = values.tolist(), weights.tolist()
+    n = len(values)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if k is None:
+        k = (4 * workers - 1).bit_length()
+    k = max(0, min(k, n))
+    shared_best = multiprocessing.Value('d', 0.0)
+    with ProcessPoolExecutor(
+            workers, initializer=_init_shard_worker,
+            initargs=(values, weights, max_weight, shared_best,
+                      prune)) as pool:
+        results = list(pool.map(_run_shard, range(1 << k),
+                                [k] * (1 << k)))
+    best_val, best = 0.0, []
+    for val, indices, _ in results:
+        # shards come back in gen_powerset order, so without pruning ties
+        # go to the subset choose_best would have kept
+        if indices is not None and val > best_val:
+            best_val, best = val, indices
+    if stats is not None:
+        stats['subsets'] = sum(count for _, _, count in results)
+    return _pick(items, best), best_val
+
+
+def gray_choose_best(items, max_weight, get_val=Item.get_value,
+                     get_weight=Item.get_weight):
+    """
+    Exhaustive search over all 2^n subsets in Gray-code order: each step
+    adds or removes one item, so the running weight and value are
+    updated in O(1) instead of being summed per subset. With float
+    weights the running totals carry rounding error; the returned value
+    is summed afresh from the chosen items.
+    :param items: list of items, or an ItemSet
+    :return: (best_set, best_val), like choose_best
+    """
+    values, weights = _columns(items, get_val, get_weight)
+    values, weights = values.tolist(), weights.tolist()
+    mask = best_mask = 0
+    wt = val = best_val = 0.0
+    for j in gray_code_flips(len(values)):
+        mask ^= 1 << j
+        if mask >> j & 1:
+            wt += weights[j]
+            val += values[j]
+        else:
+            wt -= weights[j]
+            val -= values[j]
+        if val > best_val and wt <= max_weight:
+            best_val, best_mask = val, mask
+    chosen = [i for i in range(len(values)) if best_mask >> i & 1]
+    return _pick(items, chosen), float(sum(values[i] for i in chosen))
@@ -0,0 +1,172 @@
+# mylib/landmarks.py
+import random
+import struct
+import sys
+from array import array
+
+from .graphs import Frozen_Digraph, astar, dijkstra_distances
+
+# file layout, little-endian: header (magic, node count, landmark count),
+# landmark ids int64[k], then k distance-from and k distance-to rows of
+# float64[n], all indexed by the graph's node order
+_MAGIC = b'MTCALT01'
+_HEADER = struct.Struct('<8sqq')
+
+_INF = float('inf')
+
+
+class Landmarks(object):
+    """
+    ALT (A*, landmarks, triangle inequality) preprocessing for a static
+    weighted graph.
+    landmarks is a list of node ids
+    dist_from[k][v] is the cost from landmark k to node v
+    dist_to[k][v] is the cost from node v to landmark k
+    For any nodes v, t the triangle inequality gives the lower bounds
+    d(L, t) - d(L, v) and d(v, L) - d(t, L) on d(v, t), so the A*
+    heuristic built from them keeps answers exact.
+    """
+    def __init__(self, graph, landmarks, dist_from, dist_to):
+        """
+        :param graph: Digraph or Frozen_Digraph the rows are indexed by
+        :param landmarks: list of node ids
+        :param dist_from: list of arrays, one per landmark
+        :param dist_to: list of arrays, one per landmark
+        """
+        self._graph = graph
+        self._landmarks = landmarks
+        self._dist_from = dist_from
+        self._dist_to = dist_to
+        if isinstance(graph, Frozen_Digraph):
+            self._id_of = graph.id_of
+        else:
+            ids = {node: i for i, node in enumerate(graph.get_nodes())}
+            self._id_of = ids.__getitem__
+
+    @classmethod
+    def build(cls, graph, k=8, seed=None):
+        """
+        Choose k landmarks by farthest-point selection: each new landmark
+        is the node farthest from every landmark picked so far (nodes no
+        landmark reaches count as infinitely far, so every component gets
+        covered), then record distances to and from each one.
+        :param graph: Digraph or Frozen_Digraph with non-negative weights
+        :param k: number of landmarks
+        :param seed: seed for the random starting node
+        :return: Landmarks
+        """
+        nodes = graph.get_nodes()
+        n = len(nodes)
+        if n == 0:
+            return cls(graph, [], [], [])
+        ids = {node: i for i, node in enumerate(nodes)}
+
+        def row(dists):
+            values = array('d', [_INF]) * n
+            for node, d in dists.items():
+                values[ids[node]] = d
+            return values
+
+        # start from the node farthest from a random one
+        origin = random.Random(seed).choice(nodes)
+        first = row(dijkstra_distances(graph, origin))
+        current = max(range(n), key=lambda v: (first[v] < _INF, first[v]))
+        landmarks, dist_from, dist_to = [], [], []
+        nearest = array('d', [_INF]) * n  # distance to the closest landmark
+        for _ in range(min(k, n)):
+            landmarks.append(current)
+            dist_from.append(row(dijkstra_distances(graph, nodes[current])))
+            dist_to.append(row(dijkstra_distances(graph, nodes[current],
+                                                  reverse=True)))
+            for v, d in enumerate(dist_from[-1]):
+                if d < nearest[v]:
+                    nearest[v] = d
+            candidates = (v for v in range(n) if v not in landmarks)
+            current = max(candidates, key=nearest.__getitem__, default=None)
+            if current is None:
+                break
+        return cls(graph, landmarks, dist_from, dist_to)
+
+    def get_landmarks(self):
+        """
+        :return: list of landmark Nodes
+        """
+        nodes = self._graph.get_nodes()
+        return [nodes[i] for i in self._landmarks]
+
+    def _bounds_to(self, end):
+        """
+        :return: function node -> ALT lower bound on its cost to end
+        """
+        t = self._id_of(end)
+        rows = [(dist_from, dist_from[t], dist_to, dist_to[t])
+                for dist_from, dist_to in zip(self._dist_from, self._dist_to)]
+        id_of = self._id_of
+
+        def bound(node, _end=None):
+            v = id_of(node)
+            best = 0.0
+            for dist_from, from_t, dist_to, to_t in rows:
+                from_v, to_v = dist_from[v], dist_to[v]
+                if from_t < _INF and from_v < _INF and from_t - from_v > best:
+                    best = from_t - from_v
+                if to_v < _INF and to_t < _INF and to_v - to_t > best:
+                    best = to_v - to_t
+            return best
+        return bound
+
+    def heuristic(self, node, end):
+        """
+        :return: lower bound on the cost from node to end
+        """
+        return self._bounds_to(end)(node)
+
+    def astar(self, start, end, to_print=False):
+        """
+        :param start: Node
+        :param end: Node
+        :param to_print: bool
+        :return: (cost, path) of a cheapest path, or (inf, None)
+        """
+        return astar(self._graph, start, end, self._bounds_to(end), to_print)
+
+    def save(self, path):
+        """
+        Write the landmark tables, e.g. next to a graph snapshot.
+        :param path: file path
+        """
+        n = len(self._graph)
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, n, len(self._landmarks)))
+            rows = [array('q', self._landmarks)]
+            rows += self._dist_from + self._dist_to
+            for values in rows:
+                values = array(values.typecode, values)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+        :param path: file written by save
+        :param graph: the same graph, with nodes in the same order
+        :return: Landmarks
+        """
+        with open(path, 'rb') as f:
+            magic, n, k = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError("Not a landmark file: " + str(path))
+            if n != len(graph):
+                raise ValueError("Landmarks were built for another graph")
+
+            def read(typecode, count):
+                values = array(typecode)
+                values.fromfile(f, count)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                return values
+            landmarks = list(read('q', k))
+            dist_from = [read('d', n) for _ in range(k)]
+            dist_to = [read('d', n) for _ in range(k)]
+        return cls(graph, landmarks, dist_from, dist_to)
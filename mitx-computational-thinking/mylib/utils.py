@@ -1,9 +1,28 @@
 def get_binary_rep(n, num_digits):
     """Return a zero-padded binary string of n with exactly num_digits."""
-    result = ''
-    while n > 0:
-        result = str(n % 2) + result
-        n //= 2
+    result = format(n, 'b') if n > 0 else ''
     if len(result) > num_digits:
         raise ValueError('not enough digits')
     return '0' * (num_digits - len(result)) + result
+
+
+def get_binary_bits(n, num_digits):
+    """
+    Integer form of get_binary_rep: the num_digits bits of n, most
+    significant first, as a list of 0/1 ints, with no string building.
+    """
+    if n <= 0:
+        return [0] * num_digits  # get_binary_rep gives all zeros here too
+    if n.bit_length() > num_digits:
+        raise ValueError('not enough digits')
+    return [(n >> i) & 1 for i in range(num_digits - 1, -1, -1)]
+
+
+def gray_code_flips(num_bits):
+    """
+    Yield the bit flipped at each step of the reflected Gray code over
+    num_bits bits: starting from 0, flipping the yielded bits visits all
+    2 ** num_bits masks, each differing from the last in one bit.
+    """
+    for i in range(1, 1 << num_bits):
+        yield (i & -i).bit_length() - 1